@@ -9,189 +9,374 @@ This script parses Go test files from google/cql and extracts:
 - Expected result (as string representation)
 """
 
+import mmap
+import os
 import re
 import json
 import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import List, Dict, Any, Optional
-
-def parse_go_value(value_str: str) -> Any:
-    """Parse a Go value string into a Python value representation."""
-    value_str = value_str.strip()
-
-    # Handle newOrFatal wrapper
-    match = re.match(r'newOrFatal\(t,\s*(.+)\)', value_str, re.DOTALL)
-    if match:
-        return parse_go_value(match.group(1).strip())
-
-    # Handle nil
-    if value_str == 'nil':
-        return None
-
-    # Handle integers
-    if re.match(r'^-?\d+$', value_str):
+from typing import List, Dict, Any, Optional, Tuple
+
+# orjson formats some values differently from json (raw UTF-8 instead of \u
+# escapes, 1e20 instead of 1e+20), so the checked-in data files are only
+# reproduced byte for byte by json; orjson is used only when asked for
+_USE_ORJSON = os.environ.get('EXTRACT_TESTS_ORJSON') == '1'
+
+# Every regex-recognized value form as one alternation. The alternatives start
+# with distinct prefixes, and match.lastgroup names the one that matched.
+_RE_VALUE = re.compile(
+    r'(?P<wrapped>newOrFatal\(t,\s*(?P<wrapped_value>(?s:.+))\))'
+    r'|(?P<long>int64\((?P<long_value>-?\d+)\)$)'
+    r'|(?P<float64>float64\((?P<float64_value>.+)\)$)'
+    r'|(?P<quantity>result\.Quantity\{Value:\s*(?P<quantity_value>.+),\s*Unit:\s*model\.(?P<unit>\w+)\})'
+    r'|(?P<temporal>result\.(?P<temporal_type>DateTime|Date|Time)\{Date:\s*time\.Date\((?P<args>.+)\),'
+    r'\s*Precision:\s*model\.(?P<precision>\w+)\})'
+    r'|(?P<container>result\.(?P<container_type>Interval|List|Tuple)\{(?P<body>(?s:.+))\})'
+)
+
+# Test case field patterns used by extract_test_case (matched against raw file bytes)
+_RE_CASE_FIELDS = re.compile(rb'(name|cql|wantResult):\s*')
+_RE_DQ_STRING = re.compile(rb'"((?:[^"\\]|\\.)*)"')
+_RE_NEXT_KEY = re.compile(rb'\s*(?:name:|cql:|wantModel:|wantResult:|})')
+
+# Bytes removed by bytes.strip()
+_WHITESPACE = b' \t\n\r\x0b\x0c'
+
+# Test function patterns
+# \w only matches ASCII in a bytes pattern; Go identifiers may also contain
+# non-ASCII letters, so accept UTF-8 multi-byte sequences in names too
+_RE_FUNC = re.compile(rb'func\s+(Test(?:\w|[\x80-\xff])+)\s*\(t\s+\*testing\.T\)\s*\{')
+_RE_TESTS_STRUCT = re.compile(rb'tests\s*:=\s*\[\]struct\s*\{[^}]+\}\s*\{')
+
+# Structural characters, used to jump over everything else while scanning
+_RE_STRUCT = re.compile(rb'[(){},]')
+
+# Worker processes only pay off on large inputs: extraction runs at roughly
+# 10 MB/s in-process, while starting a pool and shipping results back costs
+# tens of milliseconds, so google/cql-sized files (~100 KB) stay in-process
+_PARALLEL_MIN_BYTES = 8 * 1024 * 1024
+_PARALLEL_MIN_FUNCTIONS = 4
+
+# Sentinel returned by the _try_* helpers when a value does not match
+_MISS = object()
+
+# Values that are compared whole, checked before any other parsing
+_CONSTANTS = {
+    'nil': None,
+    'true': True,
+    'false': False,
+    'math.MaxInt32': 2147483647,
+    'math.MinInt32': -2147483648,
+}
+
+def _is_int(value_str: str) -> bool:
+    # Same as -?\d+ : isdecimal() accepts exactly the characters \d does
+    if value_str[:1] == '-':
+        return value_str[1:].isdecimal()
+    return value_str.isdecimal()
+
+def _is_float(value_str: str) -> bool:
+    # Same as -?\d+\.\d+
+    if value_str[:1] == '-':
+        value_str = value_str[1:]
+    whole, dot, fraction = value_str.partition('.')
+    return bool(dot) and whole.isdecimal() and fraction.isdecimal()
+
+def _try_int(value_str: str) -> Any:
+    if _is_int(value_str):
         return int(value_str)
+    return _MISS
 
-    # Handle longs (int64)
-    match = re.match(r'^int64\((-?\d+)\)$', value_str)
-    if match:
-        return {"type": "Long", "value": int(match.group(1))}
-
-    # Handle floats
-    if re.match(r'^-?\d+\.\d+$', value_str):
+def _try_float(value_str: str) -> Any:
+    if _is_float(value_str):
         return float(value_str)
+    return _MISS
 
-    # Handle float64 cast
-    match = re.match(r'^float64\((.+)\)$', value_str)
-    if match:
-        inner = match.group(1).strip()
+def _try_string(value_str: str) -> Any:
+    if value_str.startswith('"') and value_str.endswith('"'):
+        return value_str[1:-1]
+    return _MISS
+
+def _try_pattern(value_str: str) -> Any:
+    match = _RE_VALUE.match(value_str)
+    if not match:
+        return _MISS
+
+    kind = match.lastgroup
+    if kind == 'wrapped':
+        # Handle newOrFatal wrapper
+        return parse_go_value(match.group('wrapped_value').strip())
+    if kind == 'long':
+        return {"type": "Long", "value": int(match.group('long_value'))}
+    if kind == 'float64':
+        inner = match.group('float64_value').strip()
         try:
             return float(inner)
-        except:
+        except ValueError:
             return {"type": "Decimal", "value": inner}
-
-    # Handle booleans
-    if value_str == 'true':
-        return True
-    if value_str == 'false':
-        return False
-
-    # Handle strings
-    if value_str.startswith('"') and value_str.endswith('"'):
-        return value_str[1:-1]
-
-    # Handle Quantity
-    match = re.match(r'result\.Quantity\{Value:\s*(.+),\s*Unit:\s*model\.(\w+)\}', value_str)
-    if match:
+    # Type names, units and precisions come from a small set of model
+    # constants, so intern them to share one string per name
+    if kind == 'quantity':
         return {
             "type": "Quantity",
-            "value": float(match.group(1)),
-            "unit": match.group(2)
-        }
-
-    # Handle DateTime
-    match = re.match(r'result\.DateTime\{Date:\s*time\.Date\((.+)\),\s*Precision:\s*model\.(\w+)\}', value_str)
-    if match:
-        return {
-            "type": "DateTime",
-            "args": match.group(1),
-            "precision": match.group(2)
+            "value": float(match.group('quantity_value')),
+            "unit": sys.intern(match.group('unit'))
         }
-
-    # Handle Date
-    match = re.match(r'result\.Date\{Date:\s*time\.Date\((.+)\),\s*Precision:\s*model\.(\w+)\}', value_str)
-    if match:
+    if kind == 'temporal':
         return {
-            "type": "Date",
-            "args": match.group(1),
-            "precision": match.group(2)
-        }
-
-    # Handle Time
-    match = re.match(r'result\.Time\{Date:\s*time\.Date\((.+)\),\s*Precision:\s*model\.(\w+)\}', value_str)
-    if match:
-        return {
-            "type": "Time",
-            "args": match.group(1),
-            "precision": match.group(2)
+            "type": sys.intern(match.group('temporal_type')),
+            "args": match.group('args'),
+            "precision": sys.intern(match.group('precision'))
         }
+    return {
+        "type": sys.intern(match.group('container_type')),
+        "raw": match.group('body').strip()
+    }
 
-    # Handle Interval
-    match = re.match(r'result\.Interval\{(.+)\}', value_str, re.DOTALL)
-    if match:
-        return {
-            "type": "Interval",
-            "raw": match.group(1).strip()
-        }
+# Any other first character can still start a number, since \d also matches
+# non-ASCII digits
+_FALLBACK = [_try_int, _try_float]
+
+# Candidate handlers keyed by the first character of the value
+_DISPATCH = {
+    'n': [_try_pattern],
+    'i': [_try_pattern],
+    'f': [_try_pattern],
+    '"': [_try_string],
+    'r': [_try_pattern],
+    '-': [_try_int, _try_float],
+}
+for _digit in '0123456789':
+    _DISPATCH[_digit] = [_try_int, _try_float]
 
-    # Handle List
-    match = re.match(r'result\.List\{(.+)\}', value_str, re.DOTALL)
-    if match:
-        return {
-            "type": "List",
-            "raw": match.group(1).strip()
-        }
+def parse_go_value(value_str: str) -> Any:
+    """Parse a Go value string into a Python value representation."""
+    value_str = value_str.strip()
 
-    # Handle Tuple
-    match = re.match(r'result\.Tuple\{(.+)\}', value_str, re.DOTALL)
-    if match:
-        return {
-            "type": "Tuple",
-            "raw": match.group(1).strip()
-        }
+    value = _CONSTANTS.get(value_str, _MISS)
+    if value is not _MISS:
+        return value
 
-    # Handle math constants
-    if value_str == 'math.MaxInt32':
-        return 2147483647
-    if value_str == 'math.MinInt32':
-        return -2147483648
+    for handler in _DISPATCH.get(value_str[:1], _FALLBACK):
+        value = handler(value_str)
+        if value is not _MISS:
+            return value
 
     # Return raw for complex values
     return {"raw": value_str}
 
-def extract_test_case(content: str, start: int) -> Optional[Dict[str, Any]]:
-    """Extract a single test case starting at the given position."""
-    # Find opening brace
-    brace_pos = content.find('{', start)
-    if brace_pos == -1:
-        return None
+def parse_value_fast(value_str: str) -> Any:
+    """Parse a Go value string into the same representation as parse_go_value.
 
-    # Track brace depth to find matching closing brace
+    A hand-specialized version of parse_go_value, which stays the reference:
+    the dispatch is inlined and most forms are recognized by slicing. Only
+    Quantity and Date/DateTime/Time values still go through _RE_VALUE, where
+    slicing them apart measured slower than the single regex match.
+    """
+    value_str = value_str.strip()
+
+    value = _CONSTANTS.get(value_str, _MISS)
+    if value is not _MISS:
+        return value
+
+    first = value_str[:1]
+    if first == 'n':
+        # newOrFatal(t, <value>) - the wrapped value runs to the last ')'
+        end = value_str.rfind(')')
+        if end > 13 and value_str.startswith('newOrFatal(t,'):
+            return parse_value_fast(value_str[13:end])
+    elif first == 'r':
+        if value_str.startswith(('result.Interval{', 'result.List{', 'result.Tuple{')):
+            # The body runs to the last '}' and must not be empty
+            brace = value_str.find('{', 7)
+            end = value_str.rfind('}')
+            if end > brace + 1:
+                return {"type": sys.intern(value_str[7:brace]), "raw": value_str[brace + 1:end].strip()}
+        else:
+            value = _try_pattern(value_str)
+    elif first == 'i':
+        if value_str.startswith('int64(') and value_str.endswith(')') and _is_int(value_str[6:-1]):
+            return {"type": "Long", "value": int(value_str[6:-1])}
+    elif first == 'f':
+        inner = value_str[8:-1]
+        if value_str.startswith('float64(') and value_str.endswith(')') and inner and '\n' not in inner:
+            inner = inner.strip()
+            try:
+                return float(inner)
+            except ValueError:
+                return {"type": "Decimal", "value": inner}
+    elif first == '"':
+        if value_str.endswith('"'):
+            return value_str[1:-1]
+    elif _is_int(value_str):
+        return int(value_str)
+    elif _is_float(value_str):
+        return float(value_str)
+
+    if value is _MISS:
+        return {"raw": value_str}
+    return value
+
+# Values run through both parsers by --self-check, covering each form and the
+# edge cases the slicing in parse_value_fast has to mirror from the regexes
+_SELF_CHECK_VALUES = [
+    'nil', 'true', 'false', 'math.MaxInt32', 'math.MinInt32', 'math.Pi', 'nilx', 'trueish', '',
+    '1', '-1', '007', '-', '--1', '+1', '1_000', '0x10', '123abc', '\u0663', '\u00b2', '1e5',
+    '1.5', '-0.5', '1.', '.5', '-.5', '1.5.5', '1.\u0663', '99999999999999999999999999999',
+    '"abc"', '"', '""', '"a"b"', '"abc',
+    'int64(3)', 'int64(-3)', 'int64()', 'int64(x)', 'int64(1', 'int64(1) ', 'int32(1)',
+    'float64(2)', 'float64(1/3)', 'float64()', 'float64( 4.5 )', 'float64(1e3)', 'float64(\n1)',
+    'float64(1\n)', 'float64(1', 'float64(1))', 'float64(  )',
+    'newOrFatal(t, 1)', 'newOrFatal(t,nil)', 'newOrFatal(t, )', 'newOrFatal(t,)', 'newOrFatal(t, 1',
+    'newOrFatal(t, 1) x', 'newOrFatal(t, newOrFatal(t, 2))', 'newOrFatal(t,\n\t"a, b")', 'newOrFatal(x, 1)',
+    'result.Quantity{Value: 1, Unit: model.DAYUNIT}', 'result.Quantity{Value: 2.5,Unit:model.X_1}',
+    'result.Quantity{Value:\n1, Unit: model.X}', 'result.Quantity{Value: 1, Unit: model.X}xyz',
+    'result.Quantity{Value: 1, Unit: model.A}, Unit: model.B}', 'result.Quantity{Value: , Unit: model.X}',
+    'result.Quantity{Value: abc, Unit: model.X}', 'result.Quantity{Value: 1, Unit: model.}',
+    'result.DateTime{Date: time.Date(2024, time.March, 31, 0, 0, 0, 0, time.UTC), Precision: model.DAY}',
+    'result.DateTime{Date: time.Date(1, 2, 101e6, time.FixedZone("-07:00", -7*60*60)), Precision: model.MILLISECOND}',
+    'result.Date{Date: time.Date(2024, 1, 1), Precision: model.MONTH}',
+    'result.Time{Date: time.Date(0, 1, 1), Precision: model.HOUR}', 'result.Times{Date: time.Date(1), Precision: model.X}',
+    'result.Date{Date: time.Date(), Precision: model.X}', 'result.Date{Date: time.Date(1), Precision: model.X}extra',
+    'result.Date{Date:\ntime.Date(1), Precision: model.X}', 'result.Date{Date: time.Date(1),\nPrecision: model.X}',
+    'result.Date{Date: time.Date(1), Precision: model.X}, Precision: model.Y}',
+    'result.Interval{Low: 1}', 'result.Interval{}', 'result.Interval{}}', 'result.List{\n1,\n2}',
+    'result.List{Value: []result.Value{}}', 'result.List{', 'result.Tuple{a} x', 'result.Code{}', 'result.', 'results',
+]
+
+def _self_check_outcome(parse, value_str: str) -> str:
+    try:
+        return repr(parse(value_str))
+    except Exception as e:
+        return f"raises {type(e).__name__}"
+
+def self_check() -> int:
+    """Check that parse_value_fast agrees with parse_go_value; return the mismatch count."""
+    mismatches = 0
+    for base in _SELF_CHECK_VALUES:
+        for value_str in (base, f' {base}\n', f'newOrFatal(t, {base})'):
+            fast = _self_check_outcome(parse_value_fast, value_str)
+            reference = _self_check_outcome(parse_go_value, value_str)
+            if fast != reference:
+                mismatches += 1
+                print(f"Mismatch for {value_str!r}: {fast} != {reference}", file=sys.stderr)
+    return mismatches
+
+def _decode(data: bytes) -> str:
+    """Decode a captured slice of the file, normalizing newlines like read_text()."""
+    text = data.decode('utf-8')
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+def _scan_top_level_braces(content: bytes, pos: int) -> List[Tuple[int, int]]:
+    """Return the (start, end) span of each {...} case of the array opened just before pos."""
+    find = content.find
+    spans = []
     depth = 1
-    pos = brace_pos + 1
-    while depth > 0 and pos < len(content):
-        if content[pos] == '{':
+    case_start = pos
+    # The next '{' is only searched for again once it has been consumed
+    next_open = find(b'{', pos)
+    while True:
+        next_close = find(b'}', pos)
+        if next_close == -1:
+            break
+        if next_open != -1 and next_open < next_close:
             depth += 1
-        elif content[pos] == '}':
+            if depth == 2:
+                case_start = next_open
+            pos = next_open + 1
+            next_open = find(b'{', pos)
+        else:
             depth -= 1
-        pos += 1
-
-    if depth != 0:
-        return None
+            pos = next_close + 1
+            if depth == 1:
+                spans.append((case_start, pos))
+            elif depth == 0:
+                break
 
-    case_content = content[brace_pos:pos]
+    return spans
 
-    # Extract name
-    name_match = re.search(r'name:\s*"([^"]*)"', case_content)
-    name = name_match.group(1) if name_match else None
+def _read_quoted(content: bytes, pos: int, quote: bytes) -> Optional[bytes]:
+    """Return the text between the quote at pos and the next one, if pos is a quote."""
+    if content[pos:pos + 1] != quote:
+        return None
+    end = content.find(quote, pos + 1)
+    if end == -1:
+        return None
+    return content[pos + 1:end]
+
+def extract_test_case(case_content: bytes) -> Optional[Dict[str, Any]]:
+    """Extract a single test case from its {...} literal."""
+    name = None
+    cql_bt = None
+    cql_dq = None
+    val_start = None
+
+    # Walk the field keys once, keeping the first usable value of each
+    for field in _RE_CASE_FIELDS.finditer(case_content):
+        key = field.group(1)
+        pos = field.end()
+        if key == b'name':
+            if name is None:
+                name = _read_quoted(case_content, pos, b'"')
+        elif key == b'cql':
+            # A backtick cql anywhere takes precedence over a quoted one
+            if cql_bt is None:
+                cql_bt = _read_quoted(case_content, pos, b'`')
+                if cql_bt is None and cql_dq is None:
+                    dq_match = _RE_DQ_STRING.match(case_content, pos)
+                    if dq_match:
+                        cql_dq = dq_match.group(1)
+        elif val_start is None:
+            val_start = pos
+
+        if name is not None and cql_bt is not None and val_start is not None:
+            break
 
-    # Extract cql - handle backticks and regular strings
-    cql_match = re.search(r'cql:\s*`([^`]*)`', case_content)
-    if not cql_match:
-        cql_match = re.search(r'cql:\s*"((?:[^"\\]|\\.)*)"', case_content)
-    cql = cql_match.group(1) if cql_match else None
+    name = _decode(name) if name is not None else None
+    cql = cql_bt if cql_bt is not None else cql_dq
+    cql = _decode(cql) if cql is not None else None
 
     # Extract wantResult
     want_result = None
-    result_match = re.search(r'wantResult:\s*', case_content)
-    if result_match:
-        # Find the value after wantResult:
-        val_start = result_match.end()
+    if val_start is not None:
         # Find the end - either comma followed by newline, or closing brace
-        val_end = val_start
+        val_end = len(case_content)
         paren_depth = 0
         brace_depth = 0
-        while val_end < len(case_content):
-            c = case_content[val_end]
-            if c == '(':
+        for match in _RE_STRUCT.finditer(case_content, val_start):
+            c = match.group()
+            if c == b'(':
                 paren_depth += 1
-            elif c == ')':
+            elif c == b')':
                 paren_depth -= 1
-            elif c == '{':
+            elif c == b'{':
                 brace_depth += 1
-            elif c == '}':
+            elif c == b'}':
                 if brace_depth == 0:
+                    val_end = match.start()
                     break
                 brace_depth -= 1
-            elif c == ',' and paren_depth == 0 and brace_depth == 0:
-                # Check if this is end of value
-                remaining = case_content[val_end+1:].lstrip()
-                if remaining.startswith(('name:', 'cql:', 'wantModel:', 'wantResult:', '}')):
+            elif paren_depth == 0 and brace_depth == 0:
+                # Check if this comma is the end of value
+                if _RE_NEXT_KEY.match(case_content, match.end()):
+                    val_end = match.start()
                     break
-            val_end += 1
 
-        want_result_str = case_content[val_start:val_end].strip().rstrip(',')
-        want_result = parse_go_value(want_result_str)
+        # Trim surrounding whitespace, then trailing commas, by moving the bounds
+        # so the value is sliced out only once
+        while val_start < val_end and case_content[val_start] in _WHITESPACE:
+            val_start += 1
+        while val_end > val_start and case_content[val_end - 1] in _WHITESPACE:
+            val_end -= 1
+        while val_end > val_start and case_content[val_end - 1] in b',':
+            val_end -= 1
+
+        want_result_str = _decode(case_content[val_start:val_end])
+        want_result = parse_value_fast(want_result_str)
 
     if name and cql:
         return {
@@ -201,82 +386,104 @@ def extract_test_case(content: str, start: int) -> Optional[Dict[str, Any]]:
         }
     return None
 
-def extract_tests_from_function(content: str, func_name: str) -> List[Dict[str, Any]]:
-    """Extract all test cases from a test function."""
+def extract_tests_from_function(content: bytes, func_start: int) -> List[Dict[str, Any]]:
+    """Extract all test cases from the test function whose body starts at func_start."""
     tests = []
 
-    # Find the function
-    func_match = re.search(rf'func\s+{func_name}\s*\(t\s+\*testing\.T\)\s*\{{', content)
-    if not func_match:
-        return tests
+    # Only look inside this function: it ends where the next top-level func begins
+    func_end = content.find(b'\nfunc ', func_start)
+    if func_end == -1:
+        func_end = len(content)
 
-    func_start = func_match.end()
+    # Skip functions that are not table-driven before running the full pattern
+    if content.find(b'[]struct', func_start, func_end) == -1:
+        return tests
 
     # Find tests := []struct
-    struct_match = re.search(r'tests\s*:=\s*\[\]struct\s*\{[^}]+\}\s*\{', content[func_start:])
+    struct_match = _RE_TESTS_STRUCT.search(content, func_start, func_end)
     if not struct_match:
         return tests
 
-    array_start = func_start + struct_match.end()
-
-    # Find closing of the array
-    depth = 1
-    pos = array_start
-    while depth > 0 and pos < len(content):
-        if content[pos] == '{':
-            depth += 1
-        elif content[pos] == '}':
-            depth -= 1
-        pos += 1
-
-    array_content = content[array_start:pos-1]
+    array_start = struct_match.end()
 
-    # Extract each test case
-    case_start = 0
-    while True:
-        # Find next test case
-        next_case = array_content.find('{', case_start)
-        if next_case == -1:
-            break
-
-        case = extract_test_case(array_content, next_case)
+    # Extract each test case in a single pass over the array
+    for case_start, case_end in _scan_top_level_braces(content, array_start):
+        case = extract_test_case(content[case_start:case_end])
         if case:
             tests.append(case)
 
-        # Move past this case
-        depth = 1
-        pos = next_case + 1
-        while depth > 0 and pos < len(array_content):
-            if array_content[pos] == '{':
-                depth += 1
-            elif array_content[pos] == '}':
-                depth -= 1
-            pos += 1
-        case_start = pos
-
     return tests
 
-def extract_tests_from_file(filepath: Path) -> Dict[str, List[Dict[str, Any]]]:
-    """Extract all tests from a Go test file."""
-    content = filepath.read_text()
+# Mapping of the file being extracted, opened once per worker process
+_worker_content = None
 
-    # Find all test functions
-    func_pattern = re.compile(r'func\s+(Test\w+)\s*\(t\s+\*testing\.T\)')
-    functions = func_pattern.findall(content)
+def _init_worker(filepath: Path) -> None:
+    global _worker_content
+    with open(filepath, 'rb') as f:
+        _worker_content = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
 
+def _extract_in_worker(func_start: int) -> List[Dict[str, Any]]:
+    return extract_tests_from_function(_worker_content, func_start)
+
+def extract_tests_from_file(filepath: Path) -> Dict[str, List[Dict[str, Any]]]:
+    """Extract all tests from a Go test file."""
     all_tests = {}
-    for func_name in functions:
-        tests = extract_tests_from_function(content, func_name)
+    with open(filepath, 'rb') as f:
+        size = filepath.stat().st_size
+        # mmap cannot map an empty file
+        if size == 0:
+            return all_tests
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+            # Find all test functions and where their bodies start
+            functions = []
+            func_starts = []
+            for func_match in _RE_FUNC.finditer(content):
+                functions.append(func_match.group(1).decode('utf-8'))
+                func_starts.append(func_match.end())
+
+            workers = min(os.cpu_count() or 1, len(functions))
+            if (workers < 2 or size < _PARALLEL_MIN_BYTES
+                    or len(functions) < _PARALLEL_MIN_FUNCTIONS):
+                results = list(map(partial(extract_tests_from_function, content), func_starts))
+            else:
+                # Functions are independent, so extract them in worker processes
+                # that each map the file themselves
+                chunksize = max(1, len(functions) // (workers * 4))
+                with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(filepath,)) as executor:
+                    results = list(executor.map(_extract_in_worker, func_starts, chunksize=chunksize))
+
+    for func_name, tests in zip(functions, results):
         if tests:
             all_tests[func_name] = tests
 
     return all_tests
 
+def _orjson_dumps(result: Dict[str, Any]) -> Optional[bytes]:
+    """Serialize with orjson, or return None if it is unavailable or cannot encode result."""
+    try:
+        import orjson
+    except ImportError:
+        return None
+
+    # orjson serializes the whole document in C, much faster than json
+    try:
+        return orjson.dumps(result, option=orjson.OPT_INDENT_2)
+    except TypeError:
+        # e.g. integers beyond 64 bits, which json handles
+        return None
+
 def main():
     if len(sys.argv) < 2:
         print("Usage: extract_tests.py <go_test_file> [output_json]")
+        print("       extract_tests.py --self-check")
         sys.exit(1)
 
+    if sys.argv[1] == '--self-check':
+        mismatches = self_check()
+        print(f"Self-check: {mismatches} mismatches", file=sys.stderr)
+        sys.exit(1 if mismatches else 0)
+
     input_file = Path(sys.argv[1])
     output_file = Path(sys.argv[2]) if len(sys.argv) > 2 else None
 
@@ -295,11 +502,23 @@ def main():
         "functions": tests
     }
 
-    if output_file:
-        output_file.write_text(json.dumps(result, indent=2))
+    data = _orjson_dumps(result) if _USE_ORJSON else None
+
+    if data is not None:
+        if output_file:
+            output_file.write_bytes(data)
+            print(f"Written to {output_file}", file=sys.stderr)
+        else:
+            sys.stdout.buffer.write(data)
+            sys.stdout.buffer.write(b'\n')
+    # Otherwise stream the JSON out rather than building the whole document in memory
+    elif output_file:
+        with output_file.open('w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
         print(f"Written to {output_file}", file=sys.stderr)
     else:
-        print(json.dumps(result, indent=2))
+        json.dump(result, sys.stdout, indent=2)
+        print()
 
 if __name__ == "__main__":
     main()